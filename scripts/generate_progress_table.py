@@ -1,18 +1,33 @@
+"""Generate the iP progress table fragment from the CSV files in data/.
+
+This is the single canonical implementation; the show-ahead window below
+is the only policy knob that has varied between revisions of this script.
+"""
 import csv
+import sys
 from datetime import datetime, timedelta
-import pytz
-from collections import defaultdict
+from operator import itemgetter
+from zoneinfo import ZoneInfo
+
+# The script only ever deals in Singapore time. zoneinfo is stdlib and
+# caches zone instances internally, unlike the old pytz dependency.
+SGT = ZoneInfo('Asia/Singapore')
+
+# Tasks are shown once they are due within this many days
+SHOW_AHEAD_DAYS = 5
 
 def read_task_definitions(file_path):
     tasks = {}
     with open(file_path, 'r') as f:
         reader = csv.DictReader(f)
         for row in reader:
-            # Strip whitespace from task name and all other fields
-            task_name = row['Task Name'].strip()
+            # Strip whitespace from task name and all other fields; intern
+            # the name so lookups against the progress headers hit the
+            # dict fast path via pointer comparison
+            task_name = sys.intern(row['Task Name'].strip())
             # Parse the due date and explicitly set it to Singapore timezone
             due_date = datetime.strptime(row['Due Date'].strip(), '%m/%d/%Y %H:%M')
-            due_date = pytz.timezone('Asia/Singapore').localize(due_date)
+            due_date = due_date.replace(tzinfo=SGT)
             tasks[task_name] = {
                 'type': row['Task Type'].strip(),
                 'is_optional': row['Is Optional'].strip().lower() == 'true',
@@ -22,145 +37,128 @@ def read_task_definitions(file_path):
     return tasks
 
 def read_student_progress(file_path):
+    """Read student progress as (headers, rows).
+
+    Rows are tuples indexed positionally via the headers list; tuple
+    indexing is cheaper than a dict hash lookup per (student, task) and
+    the rows take less memory than per-student dicts. Every cell is
+    stripped once here so later comparisons use the values as-is.
+    """
     with open(file_path, 'r') as f:
-        reader = csv.DictReader(f)
-        # Convert to list and strip whitespace from all field names
-        headers = [h.strip() for h in reader.fieldnames]
-        # Create a new reader with cleaned headers
-        f.seek(0)
-        next(f)  # Skip the header row
-        return list(csv.DictReader(f, fieldnames=headers))
-
-def should_show_task(task_info):
-    now = datetime.now(pytz.timezone('Asia/Singapore'))
-    due_date = task_info['due_date']  # Already in Singapore timezone
-    
-    # Show tasks that are:
-    # 1. Due before today (past tasks)
-    # 2. Due within the next 5 days (upcoming tasks)
-    return due_date <= now + timedelta(days=5)
-
-def get_badge_html(task_name, is_completed, task_info):
-    now = datetime.now(pytz.timezone('Asia/Singapore'))
-    due_date = task_info['due_date']  # Already in Singapore timezone
-    is_overdue = now > due_date
-    is_optional = task_info['is_optional']
-    
-    # Clean up completion status and ensure it's treated as a string
-    is_completed = str(is_completed).strip() if is_completed is not None else '0'
-    
-    # If it's an optional task that's overdue and not completed, return empty string
-    if is_optional and is_overdue and is_completed != '1':
-        return ''
-    
-    if is_completed == '1':
-        # Optional tasks use bg-info, required tasks use bg-success
-        badge_class = 'bg-info' if is_optional else 'bg-success'
+        reader = csv.reader(f)
+        headers = [sys.intern(h.strip()) for h in next(reader)]
+        rows = []
+        for row in reader:
+            # Pad short rows so positional access stays in bounds
+            row += [''] * (len(headers) - len(row))
+            rows.append(tuple(value.strip() for value in row))
+    return headers, rows
+
+def precompute_badges(task_name, is_optional, is_overdue):
+    """Return the (not-completed, completed) badge HTML pair for a task.
+
+    Only two outcomes exist per task, so both strings are built once up
+    front and the per-student loop just indexes the pair by completion.
+    """
+    # Completed: optional tasks use bg-info, required tasks use bg-success
+    done_class = 'bg-info' if is_optional else 'bg-success'
+    done_html = f'<span class="badge {done_class} me-1">{task_name}</span>'
+
+    if is_optional and is_overdue:
+        # Optional tasks that are overdue and not completed show nothing
+        not_done_html = ''
     else:
-        # Not completed tasks
         if is_overdue:
-            badge_class = 'bg-danger'  # Overdue tasks are red
+            not_done_class = 'bg-danger'  # Overdue tasks are red
         else:
             # Optional tasks use bg-secondary, required tasks use bg-dark
-            badge_class = 'bg-secondary' if is_optional else 'bg-dark'
-    
-    text = task_name if is_completed == '1' else f'!{task_name}'
-    return f'<span class="badge {badge_class} me-1">{text}</span>'
-
-def sort_tasks(tasks):
-    # Create a dictionary to store tasks by type without sorting
-    sorted_tasks = defaultdict(lambda: defaultdict(list))
-    for task_name, info in tasks.items():
-        if should_show_task(info):  # Only include tasks that should be shown
-            sorted_tasks[info['type']][info['week_number']].append((task_name, info))
-    
-    # Remove the sorting step to maintain original sequence
-    return sorted_tasks
-
-def generate_progress_table(students, tasks):
+            not_done_class = 'bg-secondary' if is_optional else 'bg-dark'
+        not_done_html = f'<span class="badge {not_done_class} me-1">!{task_name}</span>'
+
+    return (not_done_html, done_html)
+
+def generate_progress_table(headers, rows, tasks, now):
     header = '''%%[This page was ==last updated on **{{ timestamp }}**==]%%    
 
 <tooltip content="NUSNET (partial)">Student</tooltip>|<tooltip content="i.e., weeks in which some code was committed to the repo">Weekly progress</tooltip>|<tooltip content="i.e., iP increments as indicated by the git tags in your fork">Increments</tooltip>|<tooltip content="i.e., other iP-related admin tasks">Admin tasks</tooltip>
 -----------------------------------------------------|-----------------------------------------------------------------------------------------------------|-----------------------------------------------------------------------------------------------------|---------------------------------------------------------------------------'''
-    
-    output = [header]
-    
-    # Create ordered lists for each type
-    weekly_tasks = []
-    increment_tasks = []
-    admin_tasks = []
-    
-    # First pass: collect tasks in original order from task_definitions.csv
-    with open('data/task_definitions.csv', 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            task_name = row['Task Name'].strip()
-            if task_name in tasks and should_show_task(tasks[task_name]):
-                task_info = tasks[task_name]
-                if task_info['type'] == 'Weekly':
-                    weekly_tasks.append((task_name, task_info))
-                elif task_info['type'] == 'Increment':
-                    increment_tasks.append((task_name, task_info))
-                elif task_info['type'] == 'Admin':
-                    admin_tasks.append((task_name, task_info))
-    
-    for student in students:
-        weekly_badges = []
-        increment_badges = []
-        admin_badges = []
-        
-        # Process Weekly tasks
-        for task_name, task_info in weekly_tasks:
-            if task_name in student:
-                badge = get_badge_html(task_name, student[task_name], task_info)
-                weekly_badges.append(badge)
-        
-        # Process Increment tasks
-        for task_name, task_info in increment_tasks:
-            if task_name in student:
-                badge = get_badge_html(task_name, student[task_name], task_info)
-                increment_badges.append(badge)
-        
-        # Process Admin tasks
-        for task_name, task_info in admin_tasks:
-            if task_name in student:
-                badge = get_badge_html(task_name, student[task_name], task_info)
-                admin_badges.append(badge)
-        
-        student_row = f"{student['Student ID']}|{''.join(weekly_badges)}|{''.join(increment_badges)}|{''.join(admin_badges)}"
-        output.append(student_row)
-    
-    return '\n'.join(output)
+
+    yield header
+
+    # Build one ordered plan per section: (task_name, badge_html_pair)
+    # tuples with everything precomputed, so the per-student loop never
+    # touches task_info again. tasks already preserves the original order
+    # from task_definitions.csv, so no need to re-read the file.
+    # Every student row comes from the same CSV header, so resolve each
+    # task name to its column index once; plans hold (column, badge pair)
+    # and tasks without a progress column are dropped here, not per student
+    col_index = {name: i for i, name in enumerate(headers)}
+    id_col = col_index['Student ID']
+    plans = {'Weekly': [], 'Increment': [], 'Admin': []}
+    for task_name, task_info in tasks.items():
+        if task_info['type'] in plans and task_name in col_index:
+            badge_html = precompute_badges(task_name, task_info['is_optional'],
+                                           now > task_info['due_date'])
+            plans[task_info['type']].append((col_index[task_name], badge_html))
+    weekly_plan = tuple(plans['Weekly'])
+    increment_plan = tuple(plans['Increment'])
+    admin_plan = tuple(plans['Admin'])
+    plan_cols = tuple(col for plan in (weekly_plan, increment_plan, admin_plan)
+                      for col, _ in plan)
+    # Specialize a gather for this run's fixed column schema: itemgetter
+    # pulls all visible task cells from a row in one C-level call. It only
+    # returns a tuple for two or more columns, hence the small fallback.
+    if len(plan_cols) > 1:
+        get_plan_cells = itemgetter(*plan_cols)
+    else:
+        get_plan_cells = lambda row: tuple(row[col] for col in plan_cols)
+
+    # A row body is fully determined by the cells of the visible task
+    # columns, so students with identical completion patterns share one
+    # cached body; in large cohorts this skips most of the badge gathering
+    body_cache = {}
+    for row in rows:
+        key = get_plan_cells(row)
+        body = body_cache.get(key)
+        if body is None:
+            # Build the whole row body as one flat list of fragments and
+            # join once, rather than three per-section joins plus an f-string.
+            parts = ['|']
+            parts.extend(badges[row[col] == '1'] for col, badges in weekly_plan)
+            parts.append('|')
+            parts.extend(badges[row[col] == '1'] for col, badges in increment_plan)
+            parts.append('|')
+            parts.extend(badges[row[col] == '1'] for col, badges in admin_plan)
+            body = ''.join(parts)
+            body_cache[key] = body
+        yield row[id_col] + body
 
 def main():
     # Read the CSV files
     tasks = read_task_definitions('data/task_definitions.csv')
-    students = read_student_progress('data/student_progress.csv')
-    
-    # Debug print task definitions and student progress
-    print("\nTask Definitions loaded:")
-    with open('data/task_definitions.csv', 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            task_name = row['Task Name'].strip()
-            if task_name in tasks:
-                info = tasks[task_name]
-                print(f"{task_name}: Week {info['week_number']}, Type: {info['type']}, Optional: {info['is_optional']}")
-    
-    print("\nChecking for undefined tasks in student progress:")
-    if students:
-        student = students[0]
-        for task_name in sorted(student.keys()):
-            if task_name not in tasks and task_name not in ['Full Name', 'Student ID']:
-                print(f"Warning: Task '{task_name}' in student progress but not in task definitions")
-    
-    # Generate the markdown content
-    markdown_content = generate_progress_table(students, tasks)
-    
-    # Write to the output file
+    headers, rows = read_student_progress('data/student_progress.csv')
+
+    # Warn about tasks tracked in student progress but missing a definition
+    for task_name in sorted(headers):
+        if task_name not in tasks and task_name not in ['Full Name', 'Student ID']:
+            print(f"Warning: Task '{task_name}' in student progress but not in task definitions")
+
+    # Generate the markdown content, pinning "now" once for the whole run.
+    # Show tasks that are:
+    # 1. Due before today (past tasks)
+    # 2. Due within the next SHOW_AHEAD_DAYS days (upcoming tasks)
+    now = datetime.now(SGT)
+    cutoff = now + timedelta(days=SHOW_AHEAD_DAYS)
+    visible_tasks = {name: info for name, info in tasks.items()
+                     if info['due_date'] <= cutoff}
+    table_rows = generate_progress_table(headers, rows, visible_tasks, now)
+
+    # Stream rows straight to the output file instead of materializing the
+    # whole markdown document as one large string first
     output_path = 'contents/cs2103/ip-progress-table-fragment.md'
     with open(output_path, 'w') as f:
-        f.write(markdown_content)
+        f.write(next(table_rows))  # Header
+        f.writelines('\n' + row for row in table_rows)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file